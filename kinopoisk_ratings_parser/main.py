@@ -5,7 +5,19 @@ import requests
 from bs4 import BeautifulSoup
 
 import translators as ts
-from cookies_file import sting_cookies, numer_user
+
+
+FIELDNAMES = [
+    "Num",
+    "Date",
+    "Name",
+    "NameRus",
+    "Rating_10",
+    "Rating",
+    "Year",
+    "Duration",
+    "Type",
+]
 
 
 def format_cookies(raw_cookies):
@@ -52,7 +64,7 @@ def detect_shortfilm(type_, duration):
     return type_
 
 
-def get_page_content(page_num, cookies):
+def get_page_content(page_num, cookies, numer_user):
     """Fetch page content from a URL."""
     response = requests.get(
         f"https://www.kinopoisk.ru/user/{numer_user}/votes/list/vs/vote/page/{page_num}/#list",
@@ -76,62 +88,56 @@ def translate_type(type_):
     return type_eng
 
 
+def parse_item(item):
+    """Extract a CSV row from a single rating item."""
+    num = item.find("div", class_="num").text
+    name_eng = item.find("div", class_="nameEng").text
+    name_rus = item.find("div", class_="nameRus").text.split("(")[0].strip()
+    if name_eng == " ":
+        name_eng = ts.translate_text(name_rus)
+    year_and_type = item.find("div", class_="nameRus").text.split("(")[1][:-1]
+    year = get_year(year_and_type).strip()
+    duration = item.find("div", class_="rating").text.strip().split("\n")[-1][:-5]
+    type_ = get_type_(year_and_type)
+    type_ = detect_shortfilm(type_, duration)
+    type_eng = translate_type(type_)
+    date = format_date(item.find("div", class_="date").text)
+    vote_10 = item.find("div", class_="vote").text
+    vote_lb = float(vote_10) / 2
+
+    return {
+        "Num": num,
+        "Date": date,
+        "Name": name_eng,
+        "NameRus": name_rus,
+        "Rating_10": vote_10,
+        "Rating": vote_lb,
+        "Year": year,
+        "Duration": duration,
+        "Type": type_eng,
+    }
+
+
 def write_to_csv(items, writer):
     """Write items to a CSV file."""
     for item in items:
-        num = item.find("div", class_="num").text
-        name_eng = item.find("div", class_="nameEng").text
-        name_rus = item.find("div", class_="nameRus").text.split("(")[0].strip()
-        if name_eng == " ":
-            name_eng = ts.translate_text(name_rus)
-        year_and_type = item.find("div", class_="nameRus").text.split("(")[1][:-1]
-        year = get_year(year_and_type).strip()
-        duration = item.find("div", class_="rating").text.strip().split("\n")[-1][:-5]
-        type_ = get_type_(year_and_type)
-        type_ = detect_shortfilm(type_, duration)
-        type_eng = translate_type(type_)
-        date = format_date(item.find("div", class_="date").text)
-        vote_10 = item.find("div", class_="vote").text
-        vote_lb = float(vote_10) / 2
-
-        writer.writerow(
-            {
-                "Num": num,
-                "Date": date,
-                "Name": name_eng,
-                "NameRus": name_rus,
-                "Rating_10": vote_10,
-                "Rating": vote_lb,
-                "Year": year,
-                "Duration": duration,
-                "Type": type_eng,
-            }
-        )
+        writer.writerow(parse_item(item))
 
 
 def main():
     """Main function to run the script."""
+    from cookies_file import sting_cookies, numer_user
+
     raw_cookies = sting_cookies
     cookies = format_cookies(
         raw_cookies
     )  # withour cookies don't work multiple responses
     page_num = 1
     with open("data.csv", "a", newline="", encoding="utf-8") as csvfile:
-        fieldnames = [
-            "Num",
-            "Date",
-            "Name",
-            "NameRus",
-            "Rating_10",
-            "Rating",
-            "Year",
-            "Duration",
-            "Type",
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
         writer.writeheader()
         while True:
-            items = get_page_content(page_num, cookies)
+            items = get_page_content(page_num, cookies, numer_user)
             if not items:
                 break
             write_to_csv(items, writer)
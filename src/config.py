@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
-from typing import Dict, List, Optional
-from pydantic import Field 
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -9,9 +9,12 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 TMP_DIR = ROOT_DIR / "tmp"
 DATA_DIR = ROOT_DIR / "data"
 LOG_DIR = ROOT_DIR / "logs"
+SNAPSHOTS_DIR = TMP_DIR / "snapshots"
+EXPORTS_DIR = DATA_DIR / "exports"
 
 IMDB_RATINGS_PATH = DATA_DIR / "imdb.csv"
 KINOPOISK_RATINGS_PATH = ROOT_DIR / "kinopoisk_ratings_parser" / "data.csv"
+ACCOUNTS_PATH = DATA_DIR / "accounts.json"
 
 
 TMP_DIR.mkdir(parents=True, exist_ok=True)
@@ -22,9 +25,57 @@ IMDB_RATINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
 KINOPOISK_RATINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _add_domain_and_path(cookies: List[Dict[str, str]]):
+    if cookies:
+        for cookie in cookies:
+            if 'domain' not in cookie:
+                cookie['domain'] = '.criticker.com'
+            if 'path' not in cookie:
+                cookie['path'] = '/'
+
+
+class AccountConfig(BaseModel):
+    """Single user of the multi-account runner (see src.core.accounts)"""
+    name: str
+    cookies_for_criticker: List[Dict[str, str]]
+    imdb_path: Optional[Path] = None
+    kinopoisk_path: Optional[Path] = None
+    # Overrides for DEFAULT_CONTEXT_SETTINGS: user_agent, locale, proxy...
+    context_settings: Dict[str, Any] = {}
+
+    @field_validator("imdb_path", "kinopoisk_path")
+    def resolve_path(cls, v: Optional[Path]) -> Optional[Path]:
+        # Relative paths in accounts.json are relative to the project, not the working directory
+        if v is not None and not v.is_absolute():
+            return ROOT_DIR / v
+        return v
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        _add_domain_and_path(self.cookies_for_criticker)
+
+
 class Settings(BaseSettings):
     COOKIES_FOR_CRITICKER: List[Dict[str, str]] = []
     COOKIES_FOR_TASTE_IO:  List[Dict[str, str]] = []
+    ENABLED_SINKS: List[str] = ["criticker"]  # "taste_io" is not implemented yet
+    # Total number of pages shared by all accounts in src.core.accounts
+    ACCOUNTS_CONCURRENCY: int = 4
+    # Contexts a single page keeps open, the least recently used account is closed first
+    ACCOUNTS_CONTEXTS_PER_WORKER: int = 3
+    # Live Kinopoisk source (src.utils.kinopoisk), same values as kinopoisk_ratings_parser/cookies_file.py
+    KINOPOISK_COOKIES: str = ""
+    KINOPOISK_USER_ID: str = ""
+    # Optional csv side output of the live source
+    KINOPOISK_CSV_PATH: Optional[Path] = None
+    # Max ratings buffered per sink while streaming
+    STREAM_QUEUE_SIZE: int = 100
+    # How duplicates from several sources are merged: latest, priority (imdb first), max, mean
+    MERGE_POLICY: str = "latest"
+    # Results report, .jsonl or .csv (logs/results_<time>.jsonl by default)
+    RESULTS_REPORT_PATH: Optional[Path] = None
+    # Console log level, DEBUG prints every search result
+    LOG_LEVEL: str = "DEBUG"
 
     class Config:
         env_file = ROOT_DIR / ".env"
@@ -32,16 +83,8 @@ class Settings(BaseSettings):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Automatically add domain/path to the cookies if missing
-        self._add_domain_and_path(self.COOKIES_FOR_CRITICKER)
-        self._add_domain_and_path(self.COOKIES_FOR_TASTE_IO)
-
-    def _add_domain_and_path(self, cookies: List[Dict[str, str]]):
-        if cookies:
-            for cookie in cookies:
-                if 'domain' not in cookie:
-                    cookie['domain'] = '.criticker.com'
-                if 'path' not in cookie:
-                    cookie['path'] = '/'
+        _add_domain_and_path(self.COOKIES_FOR_CRITICKER)
+        _add_domain_and_path(self.COOKIES_FOR_TASTE_IO)
                 
     
 
@@ -0,0 +1,184 @@
+import json
+import socket
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, List, Optional, Set, Tuple
+from loguru import logger
+from playwright.sync_api import Page
+
+from src.config import ACCOUNTS_PATH, AccountConfig, config
+from src.core.criticker import HOME_URL, CritickerSink
+from src.core.sink import FAILED, SinkReport
+from src.utils.browser import Browser
+from src.utils.browser_config import DEFAULT_ADDITIONAL_ARGS, DEFAULT_CONTEXT_SETTINGS
+from src.utils.logger import setup_logger
+from src.utils.ratings import MovieRating, main as get_ratings
+
+
+def load_accounts(path: Path = ACCOUNTS_PATH) -> List[AccountConfig]:
+    """
+    Read accounts from json:
+    [{"name": "alice", "cookies_for_criticker": [...], "imdb_path": "data/alice_imdb.csv", "context_settings": {"locale": "ru-RU"}}]
+    """
+    with open(path, encoding="utf-8") as f:
+        return [AccountConfig(**account) for account in json.load(f)]
+
+
+class _AccountState:
+    def __init__(self, account: AccountConfig, ratings: List[MovieRating]):
+        self.account = account
+        self.pending: Deque[MovieRating] = deque(ratings)
+        self.total = len(ratings)
+        self.done = 0
+        self.active = 0
+        self.report = SinkReport(sink=f"criticker:{account.name}")
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending and not self.active
+
+
+class FairScheduler:
+    """
+    Hands out ratings one at a time to the worker pages.
+    Every free page goes to the account that currently occupies the fewest pages and,
+    among those, has been handed the fewest ratings, so the concurrency budget is split
+    evenly even with more accounts than pages and is passed on as accounts finish.
+    """
+
+    def __init__(self, states: List[_AccountState]):
+        self._states = states
+        self._lock = threading.Lock()
+        self._turn = 0
+
+    def acquire(self, preferred: Set[str]) -> Optional[Tuple[_AccountState, MovieRating]]:
+        """Next (account, rating) or None when all work is handed out.
+        Only among equally served accounts the ones the worker already has a context for win."""
+        with self._lock:
+            candidates = [s for s in self._states if s.pending]
+            if not candidates:
+                return None
+
+            self._turn += 1
+            n = len(self._states)
+            state = min(candidates, key=lambda s: (
+                s.active,
+                s.total - len(s.pending),
+                s.account.name not in preferred,
+                (self._states.index(s) - self._turn) % n,
+            ))
+            state.active += 1
+            return state, state.pending.popleft()
+
+    def release(self, state: _AccountState, rating: MovieRating, status: str, reason: Optional[str] = None) -> None:
+        with self._lock:
+            state.active -= 1
+            state.done += 1
+            state.report.record(rating, status, reason)
+            logger.info("[{}] {}/{} {} ({}): {}", state.report.sink, state.done, state.total, rating.title, rating.year, status)
+
+    def is_finished(self, name: str) -> bool:
+        with self._lock:
+            return all(s.finished for s in self._states if s.account.name == name)
+
+
+class MultiAccountRunner:
+    """
+    Rates movies for many Criticker accounts with a single chromium process.
+    Every account gets its own isolated context (cookies, storage, profile settings).
+    Playwright's sync API is bound to a thread, so each worker thread connects to
+    the shared browser over CDP and drives one page at a time.
+    """
+
+    def __init__(self, accounts: List[AccountConfig],
+                 concurrency: int = config.ACCOUNTS_CONCURRENCY,
+                 contexts_per_worker: int = config.ACCOUNTS_CONTEXTS_PER_WORKER):
+        self.accounts = accounts
+        self.concurrency = max(1, concurrency)
+        self.contexts_per_worker = max(1, contexts_per_worker)
+        self._sink = CritickerSink(interactive=False)
+
+    def run(self) -> List[SinkReport]:
+        states = [
+            _AccountState(account, get_ratings(account.imdb_path, account.kinopoisk_path, f"{account.name}_"))
+            for account in self.accounts
+        ]
+        scheduler = FairScheduler(states)
+        workers = min(self.concurrency, sum(s.total for s in states))
+        if not workers:
+            logger.warning("No ratings to process")
+            return [s.report for s in states]
+
+        port = self._free_port()
+        logger.info("Starting shared browser for {} accounts with {} pages", len(states), workers)
+        errors: List[BaseException] = []
+        try:
+            with Browser() as browser:
+                browser.launch(additional_args=DEFAULT_ADDITIONAL_ARGS + [f"--remote-debugging-port={port}"])
+
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account") as pool:
+                    futures = [pool.submit(self._worker, f"http://127.0.0.1:{port}", scheduler) for _ in range(workers)]
+                    # A crashed worker only loses its page, the rest keep draining the scheduler
+                    errors.extend(filter(None, (future.exception() for future in futures)))
+        except Exception as e:
+            errors.append(e)
+
+        for error in errors:
+            logger.opt(exception=error).error("Account worker crashed: {}", error)
+
+        # Left over only if every worker crashed
+        for state in states:
+            while state.pending:
+                state.report.record(state.pending.popleft(), FAILED, "not processed: all workers crashed")
+
+        for state in states:
+            state.report.log_summary()
+        return [s.report for s in states]
+
+    def _worker(self, cdp_endpoint: str, scheduler: FairScheduler) -> None:
+        # Least recently used first
+        sessions: OrderedDict[str, Page] = OrderedDict()
+
+        with Browser() as browser:
+            browser.connect(cdp_endpoint)
+
+            while (task := scheduler.acquire(set(sessions))) is not None:
+                state, rating = task
+
+                for name in [n for n in sessions if n != state.account.name and scheduler.is_finished(n)]:
+                    browser.close_context(sessions.pop(name).context)
+
+                status, reason = FAILED, None
+                try:
+                    if state.account.name not in sessions:
+                        while len(sessions) >= self.contexts_per_worker:
+                            browser.close_context(sessions.popitem(last=False)[1].context)
+                        sessions[state.account.name] = self._open(browser, state.account)
+                    sessions.move_to_end(state.account.name)
+                    page = sessions[state.account.name] = browser.maybe_recycle(sessions[state.account.name])
+                    status = self._sink.rate(page, rating)
+                except Exception as e:
+                    reason = str(e)
+                    logger.error("[{}] Error searching for: {} ({}): {}", state.report.sink, rating.title, rating.year, e)
+                finally:
+                    scheduler.release(state, rating, status, reason)
+
+    @staticmethod
+    def _open(browser: Browser, account: AccountConfig) -> Page:
+        context = browser.new_context({**DEFAULT_CONTEXT_SETTINGS, **account.context_settings}, account.cookies_for_criticker)
+        page = browser.new_page(context)
+        page.goto(HOME_URL)
+        return page
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+
+if __name__ == "__main__":
+    setup_logger()
+    MultiAccountRunner(load_accounts()).run()
@@ -0,0 +1,111 @@
+import csv
+import io
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO
+from loguru import logger
+from pydantic import BaseModel
+
+from src.config import EXPORTS_DIR
+from src.core.sink import RATED, RatingsSink, SinkReport
+from src.utils.ratings import MovieRating, main as get_ratings
+
+
+class ImportFormat(BaseModel):
+    """Description of a bulk import file accepted by a site"""
+    name: str
+    columns: List[str]      # header order: title, year, imdb id, rating, watch date
+    max_rating: float       # top of the target scale, source ratings are 1-10
+    rating_step: float      # smallest rating increment on the target
+    date_format: str
+    max_bytes: int          # upload size limit per file
+
+    def rescale(self, rating: str) -> str:
+        value = int(rating) * self.max_rating / 10
+        value = max(self.rating_step, round(value / self.rating_step) * self.rating_step)
+        return f"{value:g}"
+
+    def to_row(self, rating: MovieRating) -> List[str]:
+        return [
+            rating.title,
+            rating.year if re.match(r'^\d{4}$', rating.year) else "",
+            rating.imdb_id or "",
+            self.rescale(rating.rating),
+            rating.rated_at.strftime(self.date_format),
+        ]
+
+
+IMPORT_FORMATS: Dict[str, ImportFormat] = {
+    "letterboxd": ImportFormat(
+        name="letterboxd",
+        columns=["Title", "Year", "imdbID", "Rating", "WatchedDate"],
+        max_rating=5,
+        rating_step=0.5,
+        date_format="%Y-%m-%d",
+        max_bytes=1_000_000,
+    ),
+}
+
+
+class ImportFileSink(RatingsSink):
+    """
+    Writes ratings into the site's bulk import format instead of rating movies one by one.
+    Rows are streamed to disk and split into several files so that none exceeds the upload limit.
+    """
+
+    def __init__(self, fmt: ImportFormat, output_dir: Path = EXPORTS_DIR):
+        self.fmt = fmt
+        self.name = f"{fmt.name}_file"
+        self.output_dir = output_dir
+        self.files: List[Path] = []
+
+    def export(self, ratings: Iterable[MovieRating]) -> SinkReport:
+        report = SinkReport(sink=self.name)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Files left from a previous run that split into more parts would be uploaded too
+        self.files = []
+        for old in self.output_dir.glob(f"{self.fmt.name}_[0-9][0-9][0-9].csv"):
+            old.unlink()
+
+        header = self._encode(self.fmt.columns)
+        out: Optional[TextIO] = None
+        size = 0
+
+        try:
+            for rating in ratings:
+                line = self._encode(self.fmt.to_row(rating))
+                if out is None or size + len(line.encode("utf-8")) > self.fmt.max_bytes:
+                    if out:
+                        out.close()
+                    out = self._open_next()
+                    out.write(header)
+                    size = len(header.encode("utf-8"))
+
+                out.write(line)
+                size += len(line.encode("utf-8"))
+                report.record(rating, RATED)
+        finally:
+            if out:
+                out.close()
+
+        logger.info("[{}] Wrote {} ratings to {} file(s): {}",
+                    self.name, report.rated, len(self.files), ", ".join(str(p) for p in self.files))
+        return report
+
+    def _open_next(self) -> TextIO:
+        path = self.output_dir / f"{self.fmt.name}_{len(self.files) + 1:03d}.csv"
+        self.files.append(path)
+        return open(path, "w", newline="", encoding="utf-8")
+
+    @staticmethod
+    def _encode(row: List[str]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    ratings = get_ratings()
+    for fmt in IMPORT_FORMATS.values():
+        ImportFileSink(fmt).export(ratings).log_summary()
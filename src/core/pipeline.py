@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from loguru import logger
+
+from src.config import config
+from src.core.criticker import CritickerSink
+from src.core.import_files import IMPORT_FORMATS, ImportFileSink
+from src.core.sink import RatingsSink, SinkReport
+from src.core.taste_io import TasteIoSink
+from src.utils.ratings import MovieRating, main as get_ratings
+
+
+SINKS: Dict[str, Callable[[], RatingsSink]] = {
+    CritickerSink.name: CritickerSink,
+    TasteIoSink.name: TasteIoSink,
+    **{f"{fmt.name}_file": (lambda fmt=fmt: ImportFileSink(fmt)) for fmt in IMPORT_FORMATS.values()},
+}
+
+
+def get_enabled_sinks(names: Optional[List[str]] = None) -> List[RatingsSink]:
+    """Instantiate sinks by name (config.ENABLED_SINKS by default)"""
+    names = config.ENABLED_SINKS if names is None else names
+    unknown = [name for name in names if name not in SINKS]
+    if unknown:
+        raise ValueError(f"Unknown sinks: {unknown}. Available: {list(SINKS)}")
+    return [SINKS[name]() for name in names]
+
+
+_DONE = object()
+
+
+class _QueueStream:
+    """Iterates a sink's queue until the producer puts _DONE"""
+
+    def __init__(self, queue: Queue):
+        self.queue = queue
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[MovieRating]:
+        while not self.exhausted:
+            rating = self.queue.get()
+            if rating is _DONE:
+                self.exhausted = True
+                return
+            yield rating
+
+
+def _consume(sink: RatingsSink, queue: Queue) -> SinkReport:
+    stream = _QueueStream(queue)
+    try:
+        return sink.export(stream)
+    finally:
+        # Keep the producer from blocking on a sink that stopped early
+        for _ in stream:
+            pass
+
+
+def _produce(ratings: Iterable[MovieRating], queues: List[Queue]) -> None:
+    try:
+        for rating in ratings:
+            for queue in queues:
+                queue.put(rating)
+    except Exception:
+        logger.exception("Ratings source failed, exporting what was received")
+    finally:
+        for queue in queues:
+            queue.put(_DONE)
+
+
+def run_pipeline(sinks: Optional[List[RatingsSink]] = None,
+                 ratings: Optional[Iterable[MovieRating]] = None,
+                 queue_size: int = config.STREAM_QUEUE_SIZE) -> List[SinkReport]:
+    """
+    Parse and merge ratings once, then feed the same list to every sink concurrently.
+    Each sink runs in its own thread with its own browser session.
+    If ratings is a stream (e.g. live Kinopoisk source) it is fanned out through a bounded
+    queue per sink, so sinks start working while the source is still producing.
+    """
+    sinks = get_enabled_sinks() if sinks is None else sinks
+    if not sinks:
+        logger.warning("No sinks enabled, nothing to export")
+        return []
+
+    # Interactive prompts must not run inside the sink threads
+    for sink in sinks:
+        sink.prepare()
+
+    ratings = get_ratings() if ratings is None else ratings
+    streamed = not isinstance(ratings, list)
+    logger.info("Exporting {} ratings to: {}", "streamed" if streamed else len(ratings), ", ".join(s.name for s in sinks))
+
+    reports = []
+    with ThreadPoolExecutor(max_workers=len(sinks), thread_name_prefix="sink") as pool:
+        if streamed:
+            queues = [Queue(maxsize=queue_size) for _ in sinks]
+            futures = {pool.submit(_consume, sink, queue): sink for sink, queue in zip(sinks, queues)}
+            threading.Thread(target=_produce, args=(ratings, queues), name="ratings-source", daemon=True).start()
+        else:
+            futures = {pool.submit(sink.export, ratings): sink for sink in sinks}
+        for future in as_completed(futures):
+            sink = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                logger.exception("[{}] Sink crashed", sink.name)
+                report = SinkReport(sink=sink.name, error=str(e))
+            report.log_summary()
+            reports.append(report)
+
+    return reports
@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+from loguru import logger
+from pydantic import BaseModel
+
+from src.utils.ratings import MovieRating
+from src.utils.report import results_stream
+
+
+RATED = "rated"
+NOT_RATED = "not_rated"
+AMBIGUOUS = "ambiguous"
+FAILED = "failed"
+
+
+class SinkReport(BaseModel):
+    """
+    Result counters of feeding ratings into a single sink.
+    Everything that wasn't rated is streamed to the results report instead of being kept here.
+    """
+    sink: str
+    rated: int = 0
+    not_rated: int = 0
+    ambiguous: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+
+    def record(self, rating: MovieRating, status: str, reason: Optional[str] = None) -> None:
+        setattr(self, status, getattr(self, status) + 1)
+        if status != RATED:
+            results_stream.write({
+                "sink": self.sink,
+                "status": status,
+                "title": rating.title,
+                "year": rating.year,
+                "rating": rating.rating,
+                "rated_at": rating.rated_at.strftime('%Y-%m-%d'),
+                "imdb_id": rating.imdb_id,
+                "reason": reason,
+            })
+
+    def log_summary(self) -> None:
+        if self.error:
+            logger.error("[{}] Aborted: {}", self.sink, self.error)
+
+        logger.info("[{}] Total Rated: {}", self.sink, self.rated)
+        logger.info("[{}] Total Not Rated: {}", self.sink, self.not_rated)
+        logger.info("[{}] Total Ambiguous: {}", self.sink, self.ambiguous)
+        logger.info("[{}] Total Failed: {}", self.sink, self.failed)
+
+        if self.not_rated or self.ambiguous or self.failed:
+            logger.info("[{}] Movies not rated are listed in {}", self.sink, results_stream.path)
+
+
+class RatingsSink(ABC):
+    """
+    Export target for the merged ratings.
+    Every sink gets the same ratings (a list, or a stream when the source is live)
+    and runs in its own thread, so implementations must not share browser sessions
+    or mutate the ratings.
+    """
+    name: str = "sink"
+
+    def prepare(self) -> None:
+        """Called in the main thread before the export threads start, e.g. to ask for missing credentials"""
+
+    @abstractmethod
+    def export(self, ratings: Iterable[MovieRating]) -> SinkReport:
+        """Push ratings to the target and report what happened to each of them"""
+
+    def progress(self, done: int, total: Optional[int], rating: MovieRating) -> None:
+        logger.info("[{}] {}/{} {} ({})", self.name, done, total or "?", rating.title, rating.year)
@@ -1,8 +1,19 @@
-from src.utils.browser import Browser
-from src.utils.ratings import main as get_ratings
-from loguru import logger 
+from typing import Iterable
+from src.core.sink import NOT_RATED, RatingsSink, SinkReport
+from src.utils.ratings import MovieRating, main as get_ratings
+from loguru import logger
+
+
+class TasteIoSink(RatingsSink):
+    name = "taste_io"
+
+    def export(self, ratings: Iterable[MovieRating]) -> SinkReport:
+        logger.error("{} is not implemented yet", __name__)
+        report = SinkReport(sink=self.name)
+        for rating in ratings:
+            report.record(rating, NOT_RATED, "not implemented")
+        return report
 
 
 def load_ratings_to_taste_io():
-    logger.error(f"{__name__} is not implemented yet")
-    pass 
\ No newline at end of file
+    TasteIoSink().export(get_ratings()).log_summary()
@@ -1,11 +1,10 @@
-from core.criticker import load_ratings_to_criticker
-from src.core.taste_io import load_ratings_to_taste_io
+from src.core.pipeline import run_pipeline
+from src.utils.ratings import get_kinopoisk_source, stream_ratings
 from src.utils.logger import setup_logger
 
 
 if __name__ == '__main__':
     setup_logger()
     
-    load_ratings_to_criticker()
-    load_ratings_to_taste_io()
-    
\ No newline at end of file
+    kinopoisk = get_kinopoisk_source()
+    run_pipeline(ratings=stream_ratings(kinopoisk) if kinopoisk else None)
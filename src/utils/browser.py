@@ -1,16 +1,26 @@
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import sync_playwright, BrowserContext, CDPSession, Page
 from typing import Optional, Dict, Any, List
 import os
+from loguru import logger
 from src.config import COOKIES_LIST
-from src.utils.browser_config import DEFAULT_LAUNCH_OPTIONS, DEFAULT_ADDITIONAL_ARGS, DEFAULT_CONTEXT_SETTINGS
+from src.utils.browser_config import DEFAULT_LAUNCH_OPTIONS, DEFAULT_ADDITIONAL_ARGS, DEFAULT_CONTEXT_SETTINGS, DEFAULT_RECYCLE_SETTINGS
 
 
 class Browser:
-    def __init__(self):
+    def __init__(self, recycle_settings: Optional[Dict[str, Any]] = DEFAULT_RECYCLE_SETTINGS):
         self._playwright = None
         self._browser = None
         self._context = None
         self._page = None
+        self._contexts: List[BrowserContext] = []
+        self._connected = False
+
+        self._recycle_settings = recycle_settings or {}
+        self._context_settings: Dict[BrowserContext, Dict[str, Any]] = {}
+        self._navigations: Dict[Page, int] = {}
+        self._cdp_sessions: Dict[Page, CDPSession] = {}
+        self._memory_checked_at: Dict[Page, int] = {}
+        self.recycle_stats = {"pages": 0, "contexts": 0, "by_navigations": 0, "by_memory": 0}
 
     def setup(self, 
               browser_type: str = "chromium",
@@ -50,13 +60,26 @@ class Browser:
                 - timezone_id="Europe/London": Устанавливает часовой пояс                  
         """
         
+        self.launch(browser_type, launch_options, additional_args)
+
+        self._context = self.new_context(context_settings, cookies)
+        self._page = self.new_page(self._context)
+
+
+    def launch(self,
+               browser_type: str = "chromium",
+               launch_options: Optional[Dict[str, Any]] = DEFAULT_LAUNCH_OPTIONS,
+               additional_args: Optional[List[str]] = DEFAULT_ADDITIONAL_ARGS) -> None:
+        """Запуск процесса браузера без создания контекста"""
+
         os.system(f"playwright install {browser_type}")
-        
+
         self._playwright = sync_playwright().start()
-        
+
+        launch_options = dict(launch_options or {})
         if additional_args:
             launch_options["args"] = additional_args
-            
+
         if browser_type == "chromium":
             self._browser = self._playwright.chromium.launch(**launch_options)
         elif browser_type == "firefox":
@@ -67,17 +90,132 @@ class Browser:
             raise ValueError(f"Неподдерживаемый тип браузера: {browser_type}")
 
 
-        self._context = self._browser.new_context(**context_settings)
-        
+    def connect(self, cdp_endpoint: str) -> None:
+        """
+        Подключение к уже запущенному chromium (--remote-debugging-port).
+        Sync API привязан к потоку, поэтому каждый поток подключается отдельно,
+        а процесс браузера остается один.
+        """
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.connect_over_cdp(cdp_endpoint)
+        self._connected = True
+
+
+    def new_context(self,
+                    context_settings: Optional[Dict[str, Any]] = DEFAULT_CONTEXT_SETTINGS,
+                    cookies: Optional[List[Dict[str, Any]]] = None) -> BrowserContext:
+        """Изолированный контекст (свои cookies, storage, кэш)"""
+        context = self._browser.new_context(**(context_settings or {}))
+
         if cookies:
-            self._context.add_cookies(cookies)
-            
-        self._context.route("**/*", self._handle_request)
-        
-        self._page = self._context.new_page()
-        self._page.set_default_timeout(30_000)
-        self._page.set_default_navigation_timeout(30_000)
-        self._setup_page_scripts()
+            context.add_cookies(cookies)
+
+        context.route("**/*", self._handle_request)
+        self._setup_page_scripts(context)
+        self._contexts.append(context)
+        self._context_settings[context] = context_settings or {}
+        return context
+
+
+    def new_page(self, context: BrowserContext) -> Page:
+        page = context.new_page()
+        page.set_default_timeout(30_000)
+        page.set_default_navigation_timeout(30_000)
+
+        self._navigations[page] = 0
+        page.on("framenavigated", lambda frame: self._on_navigated(page, frame))
+        page.on("close", lambda _: self._forget_page(page))
+        return page
+
+
+    def close_context(self, context: BrowserContext) -> None:
+        if context in self._contexts:
+            self._contexts.remove(context)
+        self._context_settings.pop(context, None)
+        context.close()
+
+
+    def maybe_recycle(self, page: Page) -> Page:
+        """
+        Заменить страницу (и контекст, если recycle_context) на свежую, если она
+        превысила лимит навигаций или памяти рендерера. Cookies сохраняются,
+        новая страница открывается на том же url. Возвращает страницу для дальнейшей работы.
+        """
+        reason = self._recycle_reason(page)
+        if not reason:
+            return page
+
+        url = page.url
+        old_context = page.context
+
+        if self._recycle_settings.get("recycle_context"):
+            settings = {**self._context_settings.get(old_context, {}), "storage_state": old_context.storage_state()}
+            context = self.new_context(settings)
+            new_page = self.new_page(context)
+            self.close_context(old_context)
+            self.recycle_stats["contexts"] += 1
+            if self._context is old_context:
+                self._context = context
+        else:
+            new_page = self.new_page(old_context)
+            page.close()
+
+        self.recycle_stats["pages"] += 1
+        self.recycle_stats[f"by_{reason}"] += 1
+        if self._page is page:
+            self._page = new_page
+
+        logger.info("Page recycled ({}), stats: {}", reason, self.recycle_stats)
+        if url and url != "about:blank":
+            # Старая страница уже закрыта, поэтому новую возвращаем даже если навигация не удалась
+            try:
+                new_page.goto(url)
+            except Exception as e:
+                logger.error("Failed to reopen {} after recycling: {}", url, e)
+        return new_page
+
+
+    def memory_usage_mb(self, page: Page) -> Optional[float]:
+        """JS heap страницы через CDP Performance.getMetrics, None если не chromium"""
+        try:
+            if page not in self._cdp_sessions:
+                session = page.context.new_cdp_session(page)
+                session.send("Performance.enable")
+                self._cdp_sessions[page] = session
+            metrics = self._cdp_sessions[page].send("Performance.getMetrics")["metrics"]
+        except Exception as e:
+            logger.debug("Renderer metrics are not available: {}", e)
+            return None
+
+        heap = next((m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"), None)
+        return heap / 2**20 if heap is not None else None
+
+
+    def _recycle_reason(self, page: Page) -> Optional[str]:
+        navigations = self._navigations.get(page, 0)
+        max_navigations = self._recycle_settings.get("max_navigations")
+        if max_navigations and navigations >= max_navigations:
+            return "navigations"
+
+        max_heap = self._recycle_settings.get("max_js_heap_mb")
+        check_every = self._recycle_settings.get("check_memory_every", 1)
+        if max_heap and navigations - self._memory_checked_at.get(page, 0) >= check_every:
+            self._memory_checked_at[page] = navigations
+            heap = self.memory_usage_mb(page)
+            if heap is not None and heap >= max_heap:
+                return "memory"
+        return None
+
+
+    def _on_navigated(self, page: Page, frame) -> None:
+        if frame == page.main_frame:
+            self._navigations[page] = self._navigations.get(page, 0) + 1
+
+
+    def _forget_page(self, page: Page) -> None:
+        self._navigations.pop(page, None)
+        self._cdp_sessions.pop(page, None)
+        self._memory_checked_at.pop(page, None)
     
     
     def _handle_request(self, route):
@@ -91,11 +229,11 @@ class Browser:
         route.continue_(headers=headers)
 
 
-    def _setup_page_scripts(self):
+    def _setup_page_scripts(self, context: BrowserContext):
         """Установка скриптов для маскировки автоматизации"""
         
         # Переопределение свойств navigator
-        self._page.add_init_script("""
+        context.add_init_script("""
         Object.defineProperty(navigator, 'webdriver', {
             get: () => undefined
         });
@@ -121,11 +259,15 @@ class Browser:
 
     def close(self) -> None:
         """Закрыть все ресурсы"""
+        if self.recycle_stats["pages"]:
+            logger.info("Pages recycled during session: {}", self.recycle_stats)
         if self._page:
             self._page.close()
-        if self._context:
-            self._context.close()
-        if self._browser:
+        for context in self._contexts:
+            context.close()
+        self._contexts.clear()
+        # close() на подключенном браузере может завершить чужой процесс
+        if self._browser and not self._connected:
             self._browser.close()
         if self._playwright:
             self._playwright.stop()
@@ -6,6 +6,15 @@ DEFAULT_LAUNCH_OPTIONS = {
 }
 
 
+# Browser.maybe_recycle: a page is replaced once it crosses any of the watermarks
+DEFAULT_RECYCLE_SETTINGS = {
+    "max_navigations": 300,     # main frame navigations per page
+    "max_js_heap_mb": 400,      # JSHeapUsedSize from CDP Performance.getMetrics (chromium only)
+    "check_memory_every": 25,   # navigations between memory checks, each check is a CDP roundtrip
+    "recycle_context": False,   # also recreate the context (cookies/storage are carried over)
+}
+
+
 DEFAULT_ADDITIONAL_ARGS = [
     "--disable-gpu",
     "--no-sandbox",
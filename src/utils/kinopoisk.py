@@ -0,0 +1,46 @@
+import csv
+from pathlib import Path
+from typing import Iterator, Optional
+from loguru import logger
+
+from kinopoisk_ratings_parser.main import FIELDNAMES, format_cookies, get_page_content, parse_item
+from src.utils.ratings import MovieRating, RatingsParser
+
+
+class KinopoiskSource:
+    """
+    In-process Kinopoisk fetcher: yields ratings page by page while they are scraped
+    instead of waiting for kinopoisk_ratings_parser to write the whole csv.
+    The csv can still be written as a side output.
+    """
+
+    def __init__(self, cookies: str, user_id: str, csv_path: Optional[Path] = None):
+        self.cookies = format_cookies(cookies)
+        self.user_id = user_id
+        self.csv_path = csv_path
+
+    def __iter__(self) -> Iterator[MovieRating]:
+        csv_file = open(self.csv_path, "w", newline="", encoding="utf-8") if self.csv_path else None
+        try:
+            writer = None
+            if csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=FIELDNAMES)
+                writer.writeheader()
+
+            page_num = 1
+            while items := get_page_content(page_num, self.cookies, self.user_id):
+                logger.info("Kinopoisk page {}: {} ratings", page_num, len(items))
+                for item in items:
+                    try:
+                        row = parse_item(item)
+                        if writer:
+                            writer.writerow(row)
+                        yield RatingsParser.kinopoisk_row_to_rating(row)
+                    except Exception as e:
+                        logger.error("Failed to parse Kinopoisk item on page {}: {}", page_num, e)
+                if csv_file:
+                    csv_file.flush()
+                page_num += 1
+        finally:
+            if csv_file:
+                csv_file.close()
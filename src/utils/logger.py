@@ -1,9 +1,91 @@
+import atexit
 import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
-from src.config import LOG_DIR
+from src.config import LOG_DIR, config
+
+
+class RateLimiter:
+    """
+    Marks records as throttled when the same line of code logs more than `burst` records
+    per `interval` seconds. When the window of a throttled line expires (checked on every
+    record and on flush) a summary with the number of dropped records is logged.
+    Errors are never dropped. Used as a patcher so all handlers see the same decision.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 1.0):
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        # site -> [window start, passed, suppressed, level name]
+        self._windows: Dict[Tuple[str, str, int], list] = {}
+
+    def __call__(self, record) -> None:
+        if record["extra"].get("rate_limit_summary"):
+            return
+        self.flush()
+        if record["level"].no >= logger.level("ERROR").no:
+            return
+
+        site = (record["name"], record["function"], record["line"])
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault(site, [now, 0, 0, record["level"].name])
+            if now - window[0] >= self.interval:
+                window[0], window[1] = now, 0
+
+            if window[1] >= self.burst:
+                window[2] += 1
+                window[3] = record["level"].name
+                record["extra"]["throttled"] = True
+                return
+
+            window[1] += 1
+
+    def flush(self, force: bool = False) -> None:
+        """Log summaries for expired windows (all windows if force)"""
+        now = time.monotonic()
+        summaries: List[Tuple[Tuple[str, str, int], int, str]] = []
+        with self._lock:
+            for site, window in self._windows.items():
+                if window[2] and (force or now - window[0] >= self.interval):
+                    summaries.append((site, window[2], window[3]))
+                    window[2] = 0
+
+        for (name, function, line), suppressed, level in summaries:
+            logger.bind(rate_limit_summary=True).log(
+                level, "+{} similar messages suppressed from {}:{}:{}", suppressed, name, function, line
+            )
+
+
+def _not_throttled(record) -> bool:
+    return not record["extra"].get("throttled")
+
+
+_rate_limiter: Optional[RateLimiter] = None
 
 
 def setup_logger(log_file='app.log') -> None:
+    global _rate_limiter
+    if _rate_limiter is not None:
+        # Counts suppressed under the previous setup would be lost with its handlers
+        _rate_limiter.flush(force=True)
+    logger.remove()
+    rate_limiter = _rate_limiter = RateLimiter()
+    logger.configure(patcher=rate_limiter)
+    # enqueue: handlers write from a background thread, callers never block on io
+    logger.add(LOG_DIR / log_file, rotation="1 MB", level="INFO", backtrace=True, diagnose=True,
+               enqueue=True, filter=_not_throttled)
+    logger.add(sys.stderr, level=config.LOG_LEVEL, backtrace=True, diagnose=True,
+               enqueue=True, filter=_not_throttled)
+    # Report pending suppressed counts and flush the queue before the interpreter exits.
+    # Only the latest limiter is reported, so setting up again doesn't stack the hooks
+    atexit.unregister(_shutdown)
+    atexit.register(_shutdown, rate_limiter)
+
+
+def _shutdown(rate_limiter: RateLimiter) -> None:
+    rate_limiter.flush(force=True)
     logger.remove()
-    logger.add(LOG_DIR / log_file, rotation="1 MB", level="INFO", backtrace=True, diagnose=True)
-    logger.add(sys.stderr, level="DEBUG", backtrace=True, diagnose=True)
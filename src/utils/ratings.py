@@ -1,13 +1,20 @@
+import hashlib
+import heapq
+import json
+from itertools import groupby
 from pathlib import Path
 import re
 import pandas as pd
 from pydantic import BaseModel, field_validator, model_validator, root_validator
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
 from loguru import logger
 from tabulate import tabulate
 
-from src.config import IMDB_RATINGS_PATH, KINOPOISK_RATINGS_PATH
+from src.config import IMDB_RATINGS_PATH, KINOPOISK_RATINGS_PATH, SNAPSHOTS_DIR, config
+from src.utils.report import results_stream
 
 
 class MovieRating(BaseModel):
@@ -16,6 +23,7 @@ class MovieRating(BaseModel):
     rating: str 
     year: str
     rated_at: datetime
+    imdb_id: Optional[str] = None
 
     _year_invalid: bool
 
@@ -35,7 +43,7 @@ class MovieRating(BaseModel):
     def validate_year(self):
         if not re.match(r'^\d{4}$', self.year):
             self._year_invalid = True
-            logger.warning(f"Invalid year format: {self.year}\nEntry: {self.model_dump_json()}")
+            logger.warning("Invalid year format: {!r} ({})", self.year, self.title)
 
         return self
 
@@ -67,7 +75,8 @@ class RatingsParser:
                             title=row['Original Title'],
                             rating=str(round(float(row['Your Rating']))),
                             year=str(row['Year']),
-                            rated_at=datetime.strptime(row['Date Rated'], '%Y-%m-%d')
+                            rated_at=datetime.strptime(row['Date Rated'], '%Y-%m-%d'),
+                            imdb_id=row.get('Const') if pd.notna(row.get('Const')) else None
                         )
                         ratings.append(rating)
                     except Exception as e:
@@ -77,7 +86,7 @@ class RatingsParser:
                     invalid_rows.append((row.to_dict(), reason))
 
             for row_data, reason in invalid_rows:
-                logger.error(f"\n[Error] {reason}\n[Row] {row_data}")
+                logger.error("[Error] {} [Row] {}", reason, row_data)
 
             logger.info(f"Successfully parsed {len(ratings)} IMDB ratings")
             logger.info(f"Unsuccessfully parsed {len(invalid_rows)} IMDB ratings")
@@ -106,13 +115,7 @@ class RatingsParser:
             for _, row in df.iterrows():
                 if pd.notna(row.get('Name')) and pd.notna(row.get('Rating_10')):
                     try:
-                        rating = MovieRating(
-                            title=row['Name'],
-                            rating=str(round(float(row['Rating_10']))),
-                            year=str(row['Year']),
-                            rated_at=datetime.strptime(row['Date'], '%Y-%m-%d')
-                        )
-                        ratings.append(rating)
+                        ratings.append(self.kinopoisk_row_to_rating(row))
                     except Exception as e:
                         invalid_rows.append((row.to_dict(), str(e)))
                 else:
@@ -120,7 +123,7 @@ class RatingsParser:
                     invalid_rows.append((row.to_dict(), reason))
 
             for row_data, reason in invalid_rows:
-                logger.error(f"\n[Error] {reason}\n[Row] {row_data}")
+                logger.error("[Error] {} [Row] {}", reason, row_data)
 
             logger.info(f"Successfully parsed {len(ratings)} Kinopoisk ratings")
             logger.info(f"Unsuccessfully parsed {len(invalid_rows)} Kinopoisk ratings")
@@ -131,24 +134,113 @@ class RatingsParser:
             return None
 
 
+    @staticmethod
+    def kinopoisk_row_to_rating(row) -> MovieRating:
+        """Row of kinopoisk_ratings_parser csv (or its parse_item dict) to MovieRating"""
+        return MovieRating(
+            title=row['Name'],
+            rating=str(round(float(row['Rating_10']))),
+            year=str(row['Year']),
+            rated_at=datetime.strptime(row['Date'], '%Y-%m-%d')
+        )
+
+
+class RatingConflict(BaseModel):
+    """Same title+year rated differently in the merged sources"""
+    title: str
+    year: str
+    kept: MovieRating
+    candidates: List[MovieRating]
+
+
+def _latest(candidates: List[Tuple[int, MovieRating]]) -> MovieRating:
+    # ties on rated_at go to the higher priority (earlier) source
+    return max(candidates, key=lambda c: (c[1].rated_at, -c[0]))[1]
+
+
+def _resolve_priority(candidates: List[Tuple[int, MovieRating]]) -> MovieRating:
+    return min(candidates, key=lambda c: c[0])[1]
+
+
+def _resolve_max(candidates: List[Tuple[int, MovieRating]]) -> MovieRating:
+    best = max(int(r.rating) for _, r in candidates)
+    return _latest(candidates).model_copy(update={"rating": str(best)})
+
+
+def _resolve_mean(candidates: List[Tuple[int, MovieRating]]) -> MovieRating:
+    mean = sum(int(r.rating) for _, r in candidates) / len(candidates)
+    # half up: round() would turn 6.5 into 6 but 7.5 into 8
+    return _latest(candidates).model_copy(update={"rating": str(int(mean + 0.5))})
+
+
+CONFLICT_POLICIES: Dict[str, Callable[[List[Tuple[int, MovieRating]]], MovieRating]] = {
+    "latest": _latest,
+    "priority": _resolve_priority,
+    "max": _resolve_max,
+    "mean": _resolve_mean,
+}
+
+
 class RatingsManager:
-    def join_ratings(ratings_lists: List[List[MovieRating]]) -> List[MovieRating]:
+    def sort_key(rating: MovieRating) -> Tuple[str, str, datetime]:
+        """Order expected by merge_ratings: title+year, then rated_at"""
+        return rating.title.lower(), rating.year, rating.rated_at
+
+    def merge_ratings(sources: List[Iterable[MovieRating]],
+                      policy: str = "latest",
+                      conflicts: Optional[List[RatingConflict]] = None) -> Iterator[MovieRating]:
+        """
+        Streaming k-way merge of sources sorted by RatingsManager.sort_key.
+        Only the current head of every source and one title+year group are held in memory.
+        Duplicates are resolved by policy (see CONFLICT_POLICIES), source order is the priority.
+        If ratings differ the conflict is appended to `conflicts`.
+        """
+        if policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy: {policy}. Available: {list(CONFLICT_POLICIES)}")
+        resolve = CONFLICT_POLICIES[policy]
+
+        def tagged(source: Iterable[MovieRating], priority: int):
+            previous = None
+            for rating in source:
+                key = RatingsManager.sort_key(rating)
+                if previous is not None and key < previous:
+                    raise ValueError(f"Source #{priority} is not sorted: {rating.title} ({rating.year})")
+                previous = key
+                yield key, priority, rating
+
+        merged = heapq.merge(*(tagged(s, i) for i, s in enumerate(sources)), key=lambda t: (t[0], t[1]))
+
+        for (title, year), group in groupby(merged, key=lambda t: t[0][:2]):
+            candidates = [(priority, rating) for _, priority, rating in group]
+            if len(candidates) == 1:
+                yield candidates[0][1]
+                continue
+
+            kept = resolve(candidates)
+            if not kept.imdb_id:
+                imdb_id = next((r.imdb_id for _, r in candidates if r.imdb_id), None)
+                if imdb_id:
+                    kept = kept.model_copy(update={"imdb_id": imdb_id})
+
+            if conflicts is not None and len({r.rating for _, r in candidates}) > 1:
+                conflicts.append(RatingConflict(
+                    title=kept.title, year=year, kept=kept, candidates=[r for _, r in candidates]
+                ))
+            yield kept
+
+    def join_ratings(ratings_lists: List[List[MovieRating]],
+                     policy: str = "priority",
+                     conflicts: Optional[List[RatingConflict]] = None) -> List[MovieRating]:
         """
         Join multiple rating lists based on title and year
-        Returns unique ratings (if same title+year exists in multiple lists, takes the first occurrence)
+        Returns unique ratings, duplicates are resolved by policy
+        (default "priority": if same title+year exists in multiple lists, takes the one from the first list)
         """
         if not ratings_lists:
             return []
 
-        # Create dictionary with (title, year) as key
-        unique_ratings = {}
-        for ratings in ratings_lists:
-            for rating in ratings:
-                key = (rating.title.lower(), rating.year)
-                if key not in unique_ratings:
-                    unique_ratings[key] = rating
-
-        return list(unique_ratings.values())
+        sources = [sorted(ratings, key=RatingsManager.sort_key) for ratings in ratings_lists]
+        return list(RatingsManager.merge_ratings(sources, policy, conflicts))
 
     def print_ratings(ratings: List[MovieRating]) -> None:
         """Print ratings in a nice tabulated format"""
@@ -175,27 +267,220 @@ class RatingsManager:
         ))
 
 
-def main() -> List[MovieRating]:
+_SCHEMA = pa.schema([
+    ("title", pa.string()),
+    ("rating", pa.string()),
+    ("year", pa.string()),
+    ("rated_at", pa.timestamp("us")),
+    ("imdb_id", pa.string()),
+])
+
+_FINGERPRINT_KEY = b"source_fingerprint"
+# Bump whenever parsing/validation or _SCHEMA changes, so old snapshots are rebuilt
+SNAPSHOT_VERSION = 1
+
+
+def fingerprint(path: Path, content_hash: bool = True) -> Dict[str, object]:
+    """Size, mtime and sha256 of the source file"""
+    stat = path.stat()
+    result = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if content_hash:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        result["sha256"] = sha.hexdigest()
+    return result
+
+
+class RatingsSnapshot:
+    """
+    Parquet snapshot of validated ratings, one file per source.
+    A snapshot is reused while its source file keeps the same fingerprint and
+    SNAPSHOT_VERSION matches, so unchanged csv's are neither parsed nor validated again.
+    """
+
+    def __init__(self, snapshots_dir: Path = SNAPSHOTS_DIR):
+        self.snapshots_dir = snapshots_dir
+
+    def load_or_parse(self, source: str, path: Optional[Path], parse: Callable[[], Optional[List[MovieRating]]]) -> Optional[List[MovieRating]]:
+        if path is not None and path.exists():
+            ratings = self.load(source, path)
+            if ratings is not None:
+                logger.info(f"Loaded {len(ratings)} {source} ratings from snapshot")
+                return ratings
+
+        # Taken before parsing: if the csv changes meanwhile the snapshot is just rebuilt next time
+        source_fingerprint = fingerprint(path) if path is not None and path.exists() else None
+        ratings = parse()
+        if ratings is not None and source_fingerprint is not None:
+            self.save(source, source_fingerprint, ratings)
+        return ratings
+
+    def load(self, source: str, path: Path) -> Optional[List[MovieRating]]:
+        """Return snapshot ratings if the source didn't change since it was taken"""
+        snapshot_path = self._snapshot_path(source)
+        if not snapshot_path.exists():
+            return None
+
+        try:
+            metadata = pq.read_schema(snapshot_path).metadata or {}
+            stored = json.loads(metadata.get(_FINGERPRINT_KEY, b"{}"))
+            if not self._is_fresh(stored, path):
+                logger.info(f"{source} snapshot is outdated, rebuilding")
+                return None
+
+            table = pq.read_table(snapshot_path)
+        except Exception as e:
+            logger.warning(f"Failed to read {source} snapshot: {e}")
+            return None
+
+        columns = table.to_pydict()
+        return [
+            self._construct(title, rating, year, rated_at, imdb_id)
+            for title, rating, year, rated_at, imdb_id in zip(
+                columns["title"], columns["rating"], columns["year"], columns["rated_at"], columns["imdb_id"]
+            )
+        ]
+
+    @staticmethod
+    def _construct(title: str, rating: str, year: str, rated_at: datetime, imdb_id: Optional[str]) -> MovieRating:
+        """Data was validated before being written, so skip pydantic validation
+        but restore what it sets, so snapshot ratings equal freshly parsed ones"""
+        fields_set = {"title", "rating", "year", "rated_at"} | ({"imdb_id"} if imdb_id is not None else set())
+        movie = MovieRating.model_construct(fields_set, title=title, rating=rating, year=year, rated_at=rated_at, imdb_id=imdb_id)
+        if not re.match(r'^\d{4}$', year):
+            movie._year_invalid = True
+        return movie
+
+    def save(self, source: str, source_fingerprint: Dict[str, object], ratings: List[MovieRating]) -> None:
+        self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pydict({
+            "title": [r.title for r in ratings],
+            "rating": [r.rating for r in ratings],
+            "year": [r.year for r in ratings],
+            "rated_at": [r.rated_at for r in ratings],
+            "imdb_id": [r.imdb_id for r in ratings],
+        }, schema=_SCHEMA)
+        table = table.replace_schema_metadata({
+            _FINGERPRINT_KEY: json.dumps({**source_fingerprint, "version": SNAPSHOT_VERSION})
+        })
+
+        snapshot_path = self._snapshot_path(source)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path)
+        tmp_path.replace(snapshot_path)
+        logger.debug(f"Saved {len(ratings)} {source} ratings to snapshot {snapshot_path}")
+
+    @staticmethod
+    def _is_fresh(stored: Dict[str, object], path: Path) -> bool:
+        if stored.get("version") != SNAPSHOT_VERSION:
+            return False
+        current = fingerprint(path, content_hash=False)
+        if stored.get("size") != current["size"]:
+            return False
+        if stored.get("mtime_ns") == current["mtime_ns"]:
+            return True
+        # Touched but maybe not modified
+        return stored.get("sha256") == fingerprint(path)["sha256"]
+
+    def _snapshot_path(self, source: str) -> Path:
+        return self.snapshots_dir / f"{source}.parquet"
+
+
+def main(imdb_path: Optional[Path] = IMDB_RATINGS_PATH,
+         kinopoisk_path: Optional[Path] = KINOPOISK_RATINGS_PATH,
+         snapshot_prefix: str = "") -> List[MovieRating]:
     """Parse and merge two csv's if present in config"""
     
     parser = RatingsParser(
-        imdb_path=IMDB_RATINGS_PATH,
-        kinopoisk_path=KINOPOISK_RATINGS_PATH
+        imdb_path=imdb_path,
+        kinopoisk_path=kinopoisk_path
     )
 
-    imdb_ratings = parser.parse_imdb()
-    kp_ratings = parser.parse_kinopoisk()
+    snapshot = RatingsSnapshot()
+    imdb_ratings = snapshot.load_or_parse(f"{snapshot_prefix}imdb", imdb_path, parser.parse_imdb) or []
+    kp_ratings = snapshot.load_or_parse(f"{snapshot_prefix}kinopoisk", kinopoisk_path, parser.parse_kinopoisk) or []
+
+    # Join ratings
+    logger.info(f"Total length before merging: imdb + kp = {len(imdb_ratings)} + {len(kp_ratings)} = {len(imdb_ratings) + len(kp_ratings)}")
+    conflicts = []
+    all_ratings = RatingsManager.join_ratings([imdb_ratings, kp_ratings], config.MERGE_POLICY, conflicts)
+    logger.info(f"Total length after merging: {len(all_ratings)} ({len(all_ratings) - len(imdb_ratings) - len(kp_ratings)})")
+    report_conflicts(conflicts, config.MERGE_POLICY)
 
-    all_ratings = []
-    if imdb_ratings and kp_ratings:
-        # Join ratings
-        logger.info(f"Total length before merging: imdb + kp = {len(imdb_ratings)} + {len(kp_ratings)} = {len(imdb_ratings) + len(kp_ratings)}")
-        all_ratings = RatingsManager.join_ratings([imdb_ratings, kp_ratings])
-        logger.info(f"Total length after merging: {len(all_ratings)} ({len(all_ratings) - len(imdb_ratings) + len(kp_ratings)})")
-        
     return all_ratings
 
 
+def report_conflicts(conflicts: List[RatingConflict], policy: str) -> None:
+    """Log merge conflicts and add them to the results report"""
+    for conflict in conflicts:
+        candidates = [c.rating for c in conflict.candidates]
+        logger.info("Rating conflict ({}): {} ({}) {} -> kept {}", policy, conflict.title, conflict.year,
+                    candidates, conflict.kept.rating)
+        results_stream.write({
+            "sink": "merge",
+            "status": "conflict",
+            "title": conflict.title,
+            "year": conflict.year,
+            "rating": conflict.kept.rating,
+            "rated_at": conflict.kept.rated_at.strftime('%Y-%m-%d'),
+            "imdb_id": conflict.kept.imdb_id,
+            "reason": f"{policy}: {' / '.join(candidates)} -> {conflict.kept.rating}",
+        })
+
+
+def stream_ratings(source: Iterable[MovieRating],
+                   imdb_path: Optional[Path] = IMDB_RATINGS_PATH,
+                   policy: Optional[str] = None) -> Iterator[MovieRating]:
+    """
+    Merge IMDB csv ratings with a live (unsorted) Kinopoisk source as it is fetched.
+    Every Kinopoisk rating is resolved right away by RatingsManager.merge_ratings against all
+    ratings of the same title+year seen so far, with the same policy and IMDB-first priority
+    as the csv path. If a later duplicate changes the resolved rating it is yielded again,
+    so sinks get the corrected score (Criticker just re-rates the movie).
+    IMDB ratings without a Kinopoisk match are yielded once the source is exhausted.
+    """
+    policy = config.MERGE_POLICY if policy is None else policy
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {policy}. Available: {list(CONFLICT_POLICIES)}")
+
+    imdb: Dict[Tuple[str, str], MovieRating] = {
+        (r.title.lower(), r.year): r for r in main(imdb_path=imdb_path, kinopoisk_path=None)
+    }
+    kinopoisk: Dict[Tuple[str, str], List[MovieRating]] = {}
+    yielded: Dict[Tuple[str, str], str] = {}
+
+    for rating in source:
+        key = (rating.title.lower(), rating.year)
+        kinopoisk.setdefault(key, []).append(rating)
+
+        sources = [[imdb[key]] if key in imdb else [], sorted(kinopoisk[key], key=RatingsManager.sort_key)]
+        conflicts = []
+        rating = next(RatingsManager.merge_ratings(sources, policy, conflicts))
+        report_conflicts(conflicts, policy)
+
+        if yielded.get(key) != rating.rating:
+            yielded[key] = rating.rating
+            yield rating
+
+    for key, rating in imdb.items():
+        if key not in yielded:
+            yield rating
+
+
+def get_kinopoisk_source() -> Optional[Iterable[MovieRating]]:
+    """Live source from config, None if Kinopoisk credentials are not set"""
+    if not config.KINOPOISK_COOKIES or not config.KINOPOISK_USER_ID:
+        return None
+
+    # requests/bs4/translators are only needed for the live source (poetry install -E kinopoisk)
+    from src.utils.kinopoisk import KinopoiskSource
+
+    return KinopoiskSource(config.KINOPOISK_COOKIES, config.KINOPOISK_USER_ID, config.KINOPOISK_CSV_PATH)
+
+
 if __name__ == "__main__":
     main()
     
\ No newline at end of file
@@ -0,0 +1,53 @@
+import csv
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+from src.config import LOG_DIR, config
+
+
+_FIELDS = ["time", "sink", "status", "title", "year", "rating", "rated_at", "imdb_id", "reason"]
+
+
+class ResultsStream:
+    """
+    Append-only report of export results, written row by row as they happen
+    so nothing is kept in memory. Format is picked by extension: .csv or .jsonl
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        row = {"time": datetime.now().isoformat(timespec="seconds"), **row}
+        with self._lock:
+            if self._file is None:
+                self._open()
+            if self._writer:
+                self._writer.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+                self._writer = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.path.suffix == ".csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=_FIELDS, extrasaction="ignore")
+            if self._file.tell() == 0:
+                self._writer.writeheader()
+
+
+results_stream = ResultsStream(config.RESULTS_REPORT_PATH or LOG_DIR / f"results_{datetime.now():%Y%m%d_%H%M%S}.jsonl")
@@ -1,5 +1,5 @@
 import json
-from src.config import ROOT_DIR, config
+from src.config import ROOT_DIR, _add_domain_and_path, config
 from src.utils.logger import logger
 from typing import Any, Tuple, List
 from src.utils.browser import Browser
@@ -22,6 +22,7 @@ def ask_for_cookies():
             if not isinstance(cookies, list):
                 raise ValueError("Input must be a list of cookies")
 
+            _add_domain_and_path(cookies)
             config.COOKIES_FOR_CRITICKER.extend(cookies)
 
             save_cookies_to_env()
@@ -73,15 +74,15 @@ def interactive_choice(target: str, pretender_rows: List[Locator]) -> Locator:
             return pretender_rows[int(choice) - 1]
 
 
-def confirm_change(field_name, existing_value, new_value):
-    if existing_value and existing_value != new_value:
+def confirm_change(field_name, existing_value, new_value, interactive: bool = True):
+    if interactive and existing_value and existing_value != new_value:
         confirm = input(f"{field_name}: current {existing_value}. Change to {new_value}? (y/n): ")
         return confirm.lower() == 'y'
     return True
 
 
-def rate_movie(selected_row: Locator, page: Page, rating: MovieRating):
-    """Rates a movie, fills out the form, and saves it"""
+def rate_movie(selected_row: Locator, page: Page, rating: MovieRating, interactive: bool = True):
+    """Rates a movie, fills out the form, and saves it (overwrites existing values without asking if not interactive)"""
     
     # click rate btn
     selected_row.wait_for() 
@@ -91,11 +92,11 @@ def rate_movie(selected_row: Locator, page: Page, rating: MovieRating):
     
     if already_rated_rate_card_btn.count() == 1:
         already_rated_rate_card_btn.wait_for()
-        logger.debug(f"Already rated btn: {already_rated_rate_card_btn.inner_html()}")
+        logger.opt(lazy=True).debug("Already rated btn: {}", already_rated_rate_card_btn.inner_html)
         page.goto(already_rated_rate_card_btn.get_attribute('href'))
     else:
         never_rated_rate_card_btn.wait_for()
-        logger.debug(f"Never rated btn: {never_rated_rate_card_btn.inner_html()}")
+        logger.opt(lazy=True).debug("Never rated btn: {}", never_rated_rate_card_btn.inner_html)
         never_rated_rate_card_btn.click()
 
     # pass rating dialog 
@@ -105,12 +106,12 @@ def rate_movie(selected_row: Locator, page: Page, rating: MovieRating):
     rating_input = rating_dialog.locator('.textinput.ratinginput')
     rating_input.wait_for()
     new_rating = str(10 * int(rating.rating))
-    if confirm_change("Rating", rating_input.input_value(), new_rating):
+    if confirm_change("Rating", rating_input.input_value(), new_rating, interactive):
         rating_input.fill(new_rating)
     
     date_input = rating_dialog.locator('#datepicker_watchdate')
     date_input.wait_for()
-    if confirm_change("Watch date", date_input.input_value(), rating.rated_at):
+    if confirm_change("Watch date", date_input.input_value(), rating.rated_at, interactive):
         formatted_date = rating.rated_at.strftime("%d %b %Y")
         date_input.fill(formatted_date)
         date_input.press('Enter')
@@ -119,4 +120,4 @@ def rate_movie(selected_row: Locator, page: Page, rating: MovieRating):
     save_button.wait_for()
     save_button.click()
     
-    logger.info(f"Movie {rating.title} ({rating.year}) successfully rated!")
\ No newline at end of file
+    logger.info("Movie {} ({}) successfully rated!", rating.title, rating.year)
\ No newline at end of file